@@ -4,6 +4,9 @@ from google.adk.runners import InMemoryRunner
 
 GEMINI_MODEL = 'gemini-2.5-flash'
 
+# State-dependent sections ({generated_code}, {review_comments}) are kept at the
+# end of each instruction, after the static text.
+
 code_writer_agent = LlmAgent(
     name="CodeWriterAgent",
     model=GEMINI_MODEL,
@@ -19,14 +22,9 @@ Do not add any other text before or after the code block.
 code_reviewer_agent = LlmAgent(
     name="CodeReviewerAgent",
     model=GEMINI_MODEL,
-    instruction="""You are an expert Python Code Reviewer. 
+    instruction="""You are an expert Python Code Reviewer.
     Your task is to provide constructive feedback on the provided code.
 
-    **Code to Review:**
-    ```python
-    {generated_code}
-    ```
-
 **Review Criteria:**
 1.  **Correctness:** Does the code work as intended? Are there logic errors?
 2.  **Readability:** Is the code clear and easy to understand? Follows PEP 8 style guidelines?
@@ -38,6 +36,11 @@ code_reviewer_agent = LlmAgent(
 Provide your feedback as a concise, bulleted list. Focus on the most important points for improvement.
 If the code is excellent and requires no changes, simply state: "No major issues found."
 Output *only* the review comments or the "No major issues" statement.
+
+    **Code to Review:**
+    ```python
+    {generated_code}
+    ```
 """,
     description="Reviews code and provides feedback.",
     output_key="review_comments",
@@ -51,14 +54,6 @@ code_refactorer_agent = LlmAgent(
     instruction="""You are a Python Code Refactoring AI.
 Your goal is to improve the given Python code based on the provided review comments.
 
-  **Original Code:**
-  ```python
-  {generated_code}
-  ```
-
-  **Review Comments:**
-  {review_comments}
-
 **Task:**
 Carefully apply the suggestions from the review comments to refactor the original code.
 If the review comments state "No major issues found," return the original code unchanged.
@@ -67,6 +62,14 @@ Ensure the final code is complete, functional, and includes necessary imports an
 **Output:**
 Output *only* the final, refactored Python code block, enclosed in triple backticks (```python ... ```). 
 Do not add any other text before or after the code block.
+
+  **Original Code:**
+  ```python
+  {generated_code}
+  ```
+
+  **Review Comments:**
+  {review_comments}
 """,
     description="Refactors code based on review comments.",
     output_key="refactored_code",
@@ -2,6 +2,10 @@ from google.adk.agents import SequentialAgent, LlmAgent
 from google.adk.models.google_llm import Gemini
 from google.genai import types
 from tools import search_web, browse_website, save_results, draft_application
+from cache import CachingLlmMixin, CachedGemini
+from templates import compile_instruction, freeze_tools
+from budget import enforce_model_budget, record_model_usage, enforce_tool_budget
+from replay import replay_model_request, record_model_response, replay_tool_call, record_tool_result
 
 import os
 from dotenv import load_dotenv
@@ -41,27 +45,58 @@ class VertexGemini(Gemini):
         return self._cached_client
 
 
+class CachedVertexGemini(CachingLlmMixin, VertexGemini):
+    """VertexGemini with the response cache in front of it."""
+
+
 # Use API key if available for local dev, otherwise fall back to Vertex AI (Cloud Run).
 api_key = os.getenv("GOOGLE_API_KEY")
 
+# Response caching is opt-in per agent: the agents run at the default temperature,
+# so their calls are only cached when listed here, e.g.
+# DANCE_AGENT_CACHE_AGENTS=DiscoveryAgent,DancerFinderAgent (or "all").
+CACHED_AGENTS = {name.strip() for name in os.getenv("DANCE_AGENT_CACHE_AGENTS", "").split(",") if name.strip()}
+
 if api_key:
     print("Using Google AI Studio (Local)")
-    model = Gemini(model="gemini-2.5-flash", api_key=api_key, retry_options=retry_config)
 else:
     print("Using Vertex AI (Cloud)")
-    model = VertexGemini(
+
+
+def make_model(agent_name):
+    """Builds the model for one agent, caching every call if the agent is in CACHED_AGENTS."""
+    cache_all = "all" in CACHED_AGENTS or agent_name in CACHED_AGENTS
+    if api_key:
+        return CachedGemini(model="gemini-2.5-flash", api_key=api_key, retry_options=retry_config,
+                            cache_all=cache_all)
+    return CachedVertexGemini(
         model="gemini-2.5-flash",
         retry_options=retry_config,
         project=PROJECT_ID,
-        location=LOCATION
+        location=LOCATION,
+        cache_all=cache_all
     )
 
+# Instructions are compiled into (constant) InstructionProviders, so ADK skips its
+# per-request state injection, and tool declarations are frozen once here.
+
+# Every agent counts tokens and tool calls against the active per-query budget
+# (see budget.py) and stops gracefully once it is spent. When a run is being
+# recorded or replayed (see replay.py), model calls and web tools go through the
+# archive; the replay callbacks run after the budget ones so they see the final request.
+agent_callbacks = dict(
+    before_model_callback=[enforce_model_budget, replay_model_request],
+    after_model_callback=[record_model_usage, record_model_response],
+    before_tool_callback=[enforce_tool_budget, replay_tool_call],
+    after_tool_callback=[record_tool_result],
+)
+
 # Agent 1: Discovery
 # Finds opportunities based on the user's profile.
 discovery_agent = LlmAgent(
     name="DiscoveryAgent",
-    model=model,
-    instruction="""You are a Dance Opportunity Discovery Agent. Find REAL dance opportunities.
+    model=make_model("DiscoveryAgent"),
+    instruction=compile_instruction("""You are a Dance Opportunity Discovery Agent. Find REAL dance opportunities.
 
 ACTIONS:
 1. search_web for festivals, sabhas, consulates, mentorships, collaborations.
@@ -69,17 +104,18 @@ ACTIONS:
 3. Compile findings (Name, URL, Type, Details, Deadline).
 4. save_results to "opportunities_found.txt".
 
-Call tools. Do not give up.""",
-    tools=[search_web, browse_website, save_results],
-    output_key="discovered_opportunities"
+Call tools. Do not give up."""),
+    tools=freeze_tools(search_web, browse_website, save_results),
+    output_key="discovered_opportunities",
+    **agent_callbacks
 )
 
 # Agent 2: Dancer Finder
 # Finds other dancers for networking/collaboration.
 dancer_finder_agent = LlmAgent(
     name="DancerFinderAgent",
-    model=model,
-    instruction="""You are a Dancer Finder Agent. Find prominent dancers in the same style.
+    model=make_model("DancerFinderAgent"),
+    instruction=compile_instruction("""You are a Dancer Finder Agent. Find prominent dancers in the same style.
 
 ACTIONS:
 1. search_web for "prominent [style] dancers", "upcoming [style] artists".
@@ -87,17 +123,18 @@ ACTIONS:
 3. Compile list (Name, Location, Style, Contact/Socials).
 4. save_results to "dancers_found.txt".
 
-Focus on active performers.""",
-    tools=[search_web, browse_website, save_results],
-    output_key="found_dancers"
+Focus on active performers."""),
+    tools=freeze_tools(search_web, browse_website, save_results),
+    output_key="found_dancers",
+    **agent_callbacks
 )
 
 # Agent 3: Application Drafter
 # Drafts emails/applications for the found opportunities.
 application_agent = LlmAgent(
     name="ApplicationAgent",
-    model=model,
-    instruction="""You are an Application Drafting Agent.
+    model=make_model("ApplicationAgent"),
+    instruction=compile_instruction("""You are an Application Drafting Agent.
 
 INPUT: "opportunities_found.txt" and "dancers_found.txt".
 TASK: Draft personalized applications/emails for the BEST opportunities found.
@@ -108,9 +145,10 @@ ACTIONS:
 3. Use draft_application tool to save each draft.
 4. Use save_results to create a summary in "applications_drafted.txt".
 
-Be professional, concise, and persuasive.""",
-    tools=[draft_application, save_results],
-    output_key="applications_drafted"
+Be professional, concise, and persuasive."""),
+    tools=freeze_tools(draft_application, save_results),
+    output_key="applications_drafted",
+    **agent_callbacks
 )
 
 # ORCHESTRATION: Sequential Agent System
@@ -0,0 +1,100 @@
+"""Micro-benchmark: per-request instruction rendering and tool-declaration cost.
+
+Compares ADK's default path (regex state injection on a string instruction,
+FunctionTool's own declaration path) with compile_instruction /
+FrozenFunctionTool, and estimates the static prefix (system instruction + tool
+schema) each agent sends, to see whether Gemini's implicit context caching
+could apply to it at all.
+
+    cd dance_agent_system
+    python bench_templates.py
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from google.adk.tools import FunctionTool
+from google.adk.utils.instructions_utils import inject_session_state
+
+from templates import compile_instruction, FrozenFunctionTool
+from tools import search_web, browse_website, save_results, draft_application
+
+ITERATIONS = 2000
+IMPLICIT_CACHE_MIN_TOKENS = 1024
+
+# Shaped like the SequentialAgent reviewer: static criteria first, state last.
+REVIEW_TEMPLATE = "You are an expert Python Code Reviewer.\n" + "Review criterion line.\n" * 40 + """
+**Code to Review:**
+```python
+{generated_code}
+```
+"""
+
+
+def _fake_context(state):
+    return SimpleNamespace(
+        state=state,
+        agent_name="BenchAgent",
+        _invocation_context=SimpleNamespace(session=SimpleNamespace(state=state), artifact_service=None),
+    )
+
+
+def _per_call_us(fn, iterations=ITERATIONS):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def bench_instructions():
+    ctx = _fake_context({"generated_code": "def fib(n):\n    return n\n" * 50})
+    compiled = compile_instruction(REVIEW_TEMPLATE)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await inject_session_state(REVIEW_TEMPLATE, ctx)
+    default_us = (time.perf_counter() - start) / ITERATIONS * 1e6
+    compiled_us = _per_call_us(lambda: compiled(ctx))
+
+    assert compiled(ctx) == await inject_session_state(REVIEW_TEMPLATE, ctx)
+    print(f"instruction render   default {default_us:8.1f} us   compiled {compiled_us:8.1f} us   (with state)")
+
+    # The dance agents' instructions have no placeholders.
+    static = REVIEW_TEMPLATE.replace("{generated_code}", "")
+    constant = compile_instruction(static)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await inject_session_state(static, ctx)
+    default_us = (time.perf_counter() - start) / ITERATIONS * 1e6
+    constant_us = _per_call_us(lambda: constant(ctx))
+    print(f"instruction render   default {default_us:8.1f} us   compiled {constant_us:8.1f} us   (static)")
+
+
+def bench_declarations():
+    funcs = [search_web, browse_website, save_results, draft_application]
+    default_tools = [FunctionTool(f) for f in funcs]
+    frozen_tools = [FrozenFunctionTool(f) for f in funcs]
+
+    default_us = _per_call_us(lambda: [t._get_declaration() for t in default_tools], ITERATIONS // 10)
+    frozen_us = _per_call_us(lambda: [t._get_declaration() for t in frozen_tools], ITERATIONS // 10)
+    print(f"tool declarations    default {default_us:8.1f} us   frozen   {frozen_us:8.1f} us   (4 tools)")
+
+
+def report_stable_prefix():
+    # Imported here: building the agents reads .env and picks a model backend.
+    from agents import discovery_agent, dancer_finder_agent, application_agent
+
+    print("\nStatic prefix per request (rough estimate, ~4 chars/token):")
+    for agent in (discovery_agent, dancer_finder_agent, application_agent):
+        declarations = [t._get_declaration().model_dump(mode="json", exclude_none=True) for t in agent.tools]
+        tokens = (len(agent.instruction(None)) + len(json.dumps(declarations))) // 4
+        verdict = "eligible" if tokens >= IMPLICIT_CACHE_MIN_TOKENS else "too short, no token savings"
+        print(f"  {agent.name:<20} ~{tokens:5d} tokens   implicit caching: {verdict}")
+    print(f"  (Gemini 2.5 Flash only caches implicitly from ~{IMPLICIT_CACHE_MIN_TOKENS} shared prefix tokens.)")
+
+if __name__ == "__main__":
+    asyncio.run(bench_instructions())
+    bench_declarations()
+    report_stable_prefix()
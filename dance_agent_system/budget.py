@@ -0,0 +1,203 @@
+"""Per-query token, tool-call and wall-time budgets.
+
+A query runs inside `with budget_scope(QueryBudget(...)) as usage:`. The agent
+callbacks below count model tokens and tool calls against the active budget.
+Once a limit is hit, web tools are refused and the agents get a few wrap-up model
+calls to save what they have found, after which model calls are short-circuited.
+Before each agent the caller calls `usage.check()` to skip the remaining agents
+once the budget is spent, and finally logs `usage.report()`.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from logger import logger
+
+# Local tools that let an agent persist partial results after the budget is spent.
+WRAP_UP_TOOLS = {"save_results", "draft_application"}
+
+
+def _env_number(name, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+class QueryBudget:
+    """Limits for one query across all agents. None means unlimited."""
+
+    def __init__(self, max_tokens: Optional[int] = None, max_tool_calls: Optional[int] = None,
+                 max_wall_time: Optional[float] = None, wrap_up_calls: int = 2):
+        self.max_tokens = max_tokens
+        self.max_tool_calls = max_tool_calls
+        self.max_wall_time = max_wall_time
+        self.wrap_up_calls = wrap_up_calls
+
+    @classmethod
+    def from_env(cls):
+        """Reads DANCE_AGENT_MAX_TOKENS, DANCE_AGENT_MAX_TOOL_CALLS and DANCE_AGENT_MAX_WALL_TIME."""
+        return cls(
+            max_tokens=_env_number("DANCE_AGENT_MAX_TOKENS", int),
+            max_tool_calls=_env_number("DANCE_AGENT_MAX_TOOL_CALLS", int),
+            max_wall_time=_env_number("DANCE_AGENT_MAX_WALL_TIME", float),
+        )
+
+
+class BudgetUsage:
+    """Running usage for one query, checked against its QueryBudget."""
+
+    def __init__(self, budget: QueryBudget):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.total_tokens = 0
+        self.model_calls = 0
+        self.tool_calls = 0
+        self.refused_tool_calls = 0
+        self.wrap_up_calls = 0
+        self.exceeded = None
+        # check() calls so far, and the one at which the budget ran out. Replay
+        # counts on these, so check() is only called at fixed points: the
+        # callbacks below and the caller's per-agent check.
+        self.checks = 0
+        self.exhausted_at = None
+        # Set on replay: where the recorded run ran out (or {} if it never did).
+        self.replayed_exhaustion = None
+
+    def follow(self, exhaustion: Optional[dict]):
+        """Replays a recorded run's budget: runs out at the same check() it did.
+
+        Live limits are ignored, since replay answers model and web calls at a
+        different speed and the wrap-up instruction must match the recording.
+        """
+        self.replayed_exhaustion = exhaustion or {}
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @contextmanager
+    def paused(self):
+        """Leaves time spent inside the block (e.g. waiting on the user) out of the wall time."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.started += time.monotonic() - start
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether a check() has found the budget spent. Does not check again."""
+        return self.exceeded is not None
+
+    def check(self) -> Optional[str]:
+        """Returns why the budget is exhausted, or None if there is room left."""
+        if self.exceeded:
+            return self.exceeded
+        self.checks += 1
+        replayed = self.replayed_exhaustion
+        budget = self.budget
+        if replayed is not None:
+            if replayed and self.checks >= replayed["check"]:
+                self.exceeded = replayed["reason"]
+        elif budget.max_tokens is not None and self.total_tokens >= budget.max_tokens:
+            self.exceeded = f"token budget of {budget.max_tokens} reached"
+        elif budget.max_tool_calls is not None and self.tool_calls >= budget.max_tool_calls:
+            self.exceeded = f"tool-call budget of {budget.max_tool_calls} reached"
+        elif budget.max_wall_time is not None and self.elapsed >= budget.max_wall_time:
+            self.exceeded = f"wall-time budget of {budget.max_wall_time:.0f}s reached"
+        if self.exceeded:
+            self.exhausted_at = self.checks
+            logger.warning(f"[BUDGET] {self.exceeded}")
+        return self.exceeded
+
+    def record_usage(self, usage_metadata):
+        if usage_metadata is None:
+            return
+        self.prompt_tokens += usage_metadata.prompt_token_count or 0
+        self.output_tokens += usage_metadata.candidates_token_count or 0
+        self.total_tokens += usage_metadata.total_token_count or 0
+
+    def report(self) -> str:
+        lines = [
+            f"Tokens: {self.total_tokens} (prompt {self.prompt_tokens}, output {self.output_tokens})",
+            f"Model calls: {self.model_calls}",
+            f"Tool calls: {self.tool_calls} (refused {self.refused_tool_calls})",
+            f"Wall time: {self.elapsed:.1f}s",
+        ]
+        if self.exceeded:
+            lines.append(f"Stopped early: {self.exceeded}")
+        return "\n".join(lines)
+
+
+_current_usage = ContextVar("query_budget_usage", default=None)
+
+
+@contextmanager
+def budget_scope(budget: QueryBudget):
+    """Makes `budget` the active budget for every agent run inside the block."""
+    usage = BudgetUsage(budget)
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def current_usage() -> Optional[BudgetUsage]:
+    return _current_usage.get()
+
+
+# --- Agent callbacks ---
+
+def enforce_model_budget(callback_context, llm_request) -> Optional[LlmResponse]:
+    """before_model_callback: tells the agent to wrap up, then stops it."""
+    usage = current_usage()
+    if usage is None:
+        return None
+    reason = usage.check()
+    if reason is None:
+        usage.model_calls += 1
+        return None
+
+    if usage.wrap_up_calls < usage.budget.wrap_up_calls:
+        usage.wrap_up_calls += 1
+        usage.model_calls += 1
+        llm_request.append_instructions([
+            f"BUDGET EXHAUSTED ({reason}). Do not search or browse any more. "
+            "Save the results you already have now with save_results, then finish."
+        ])
+        return None
+
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[types.Part(text=f"Stopping early: {reason}. Partial results have been kept.")],
+        )
+    )
+
+
+def record_model_usage(callback_context, llm_response) -> Optional[LlmResponse]:
+    """after_model_callback: adds the response's token usage to the active budget."""
+    usage = current_usage()
+    if usage is not None and not llm_response.partial:
+        usage.record_usage(llm_response.usage_metadata)
+    return None
+
+
+def enforce_tool_budget(tool, args, tool_context) -> Optional[dict]:
+    """before_tool_callback: counts tool calls and refuses web tools once the budget is spent."""
+    usage = current_usage()
+    if usage is None:
+        return None
+    reason = usage.check()
+    if reason is not None and tool.name not in WRAP_UP_TOOLS:
+        usage.refused_tool_calls += 1
+        return {"error": f"Budget exhausted ({reason}). Save your results now and finish."}
+    usage.tool_calls += 1
+    return None
@@ -0,0 +1,209 @@
+"""Response cache for deterministic LLM calls.
+
+Identical prompts (same discovery query for the same profile, same judge prompt)
+are answered from a local SQLite store instead of paying for a new Gemini call.
+
+A call is cacheable when its temperature is 0, when the model was built with
+cache_all=True, or when it runs inside a `with cacheable():` block.
+Set DANCE_AGENT_CACHE_BYPASS=1 (or use `with bypass_cache():`) to skip it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from logger import logger
+from session import DATA_DIR
+
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.sqlite")
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+_force_cacheable = ContextVar("force_cacheable", default=False)
+_bypass = ContextVar("bypass_cache", default=False)
+
+
+@contextmanager
+def cacheable():
+    """Marks every model call made inside the block as cacheable."""
+    token = _force_cacheable.set(True)
+    try:
+        yield
+    finally:
+        _force_cacheable.reset(token)
+
+
+@contextmanager
+def bypass_cache():
+    """Skips the response cache for every model call made inside the block."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _cache_bypassed() -> bool:
+    return _bypass.get() or os.getenv("DANCE_AGENT_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+
+
+def request_key(model_name: str, llm_request) -> str:
+    """Hashes model, system instruction, contents, tool schema and generation config."""
+    config = llm_request.config.model_dump(mode="json", exclude_none=True) if llm_request.config else {}
+    payload = {
+        "model": llm_request.model or model_name,
+        "system_instruction": config.pop("system_instruction", None),
+        "tools": config.pop("tools", None),
+        "contents": [c.model_dump(mode="json", exclude_none=True) for c in llm_request.contents],
+        "config": config,
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response store with TTL and size-bounded LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: Optional[float] = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[list]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value)
+
+    def put(self, key: str, value: list):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+
+
+def get_default_cache() -> ResponseCache:
+    """Returns the shared on-disk cache, configured from the environment on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache(
+            path=os.getenv("DANCE_AGENT_CACHE_PATH", DEFAULT_CACHE_PATH),
+            ttl=float(os.getenv("DANCE_AGENT_CACHE_TTL", DEFAULT_TTL)),
+            max_entries=int(os.getenv("DANCE_AGENT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        )
+    return _default_cache
+
+
+class CachingLlmMixin:
+    """Adds response caching to a Gemini model class.
+
+    Mix in ahead of the model class, e.g. `class CachedGemini(CachingLlmMixin, Gemini)`.
+    Extra keyword arguments:
+        response_cache: The ResponseCache to use (default: shared on-disk cache)
+        cache_all: Cache every call, not only temperature-0 ones
+        bypass_cache: Never read from or write to the cache
+    """
+
+    def __init__(self, *args, response_cache: Optional[ResponseCache] = None, cache_all: bool = False,
+                 bypass_cache: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._response_cache = response_cache
+        self._cache_all = cache_all
+        self._bypass_cache = bypass_cache
+
+    def _is_cacheable(self, llm_request) -> bool:
+        if self._bypass_cache or _cache_bypassed():
+            return False
+        if self._cache_all or _force_cacheable.get():
+            return True
+        temperature = llm_request.config.temperature if llm_request.config else None
+        return temperature == 0
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        if not self._is_cacheable(llm_request):
+            async for response in super().generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        cache = self._response_cache or get_default_cache()
+        key = request_key(self.model, llm_request)
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"[CACHE] hit {key[:12]}")
+            for data in cached:
+                yield LlmResponse.model_validate(data)
+            return
+
+        responses = []
+        cache_ok = True
+        async for response in super().generate_content_async(llm_request, stream=stream):
+            # Only complete answers are worth replaying: not errors, truncated
+            # (MAX_TOKENS) or blocked (SAFETY, ...) responses. Partial chunks have no reason.
+            if response.error_code or response.finish_reason not in (None, types.FinishReason.STOP):
+                cache_ok = False
+            responses.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+
+        if cache_ok and responses:
+            cache.put(key, responses)
+            logger.debug(f"[CACHE] stored {key[:12]}")
+
+
+class CachedGemini(CachingLlmMixin, Gemini):
+    """Gemini with the response cache in front of it."""
@@ -0,0 +1,282 @@
+"""Polite, per-domain scheduled fetching for browse_website.
+
+- One requests.Session with per-host connection pools, so repeat visits to the
+  same sabha/festival site reuse connections.
+- Per-host token buckets pace requests (honouring robots.txt Crawl-delay).
+- robots.txt is fetched once per host (one fetch in flight per host, paced like
+  any other request) and cached; a throttled or failing robots.txt is retried soon.
+- 429/503 responses put the host into backoff (Retry-After aware) and are retried.
+- Each fetch has a total deadline: if the host's queue or backoff would run past
+  it, the fetch fails fast with FetchTimeout instead of sleeping.
+- Callers waiting on the same host are served round-robin across sessions, so one
+  busy session cannot starve the others.
+"""
+
+import email.utils
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from logger import logger
+
+USER_AGENT = os.getenv(
+    "DANCE_AGENT_USER_AGENT",
+    "DanceAgentBot/1.0 (+https://github.com/sakethbalijepalli/google-agents)",
+)
+ROBOTS_TTL = 24 * 3600
+# How soon to retry a robots.txt that was throttled, erroring or unreachable.
+ROBOTS_RETRY_TTL = 300
+RETRY_STATUSES = {429, 503}
+
+
+class RobotsDisallowed(Exception):
+    """The URL is disallowed for our user agent by the site's robots.txt."""
+
+
+class RobotsUnavailable(Exception):
+    """The site's robots.txt could not be read right now (throttled, erroring or unreachable)."""
+
+
+class FetchTimeout(Exception):
+    """The fetch could not finish within its deadline (host busy or backing off)."""
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostState:
+    """Token bucket, backoff and fair wait queue for one host."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        # session key -> deque of waiting tickets, in round-robin order
+        self.waiting = OrderedDict()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a request may go out (0 if one may go now)."""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def next_ticket(self):
+        if not self.waiting:
+            return None
+        return next(iter(self.waiting.values()))[0]
+
+    def serve(self, session_key):
+        tickets = self.waiting[session_key]
+        tickets.popleft()
+        if tickets:
+            self.waiting.move_to_end(session_key)
+        else:
+            del self.waiting[session_key]
+        self.tokens -= 1
+
+    def withdraw(self, session_key, ticket):
+        tickets = self.waiting.get(session_key)
+        if tickets is None:
+            return
+        tickets.remove(ticket)
+        if not tickets:
+            del self.waiting[session_key]
+
+
+class PoliteCrawler:
+    """Shared fetcher that schedules requests per domain."""
+
+    def __init__(self, rate: float = 1.0, burst: int = 2, max_retries: int = 3,
+                 backoff_base: float = 2.0, max_backoff: float = 60.0, timeout: float = 15,
+                 max_fetch_time: float = 30.0, user_agent: str = USER_AGENT):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.max_fetch_time = max_fetch_time
+        self.user_agent = user_agent
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cond = threading.Condition()
+        self._hosts = {}
+        self._robots = {}  # host -> (parser or None if unavailable, expires_at)
+        self._robots_lock = threading.Lock()
+        self._robots_fetch_locks = {}
+
+    def _host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.rate, self.burst)
+        return state
+
+    # --- robots.txt ---
+
+    def _cached_robots(self, host: str) -> Optional[tuple]:
+        with self._robots_lock:
+            cached = self._robots.get(host)
+        if cached and time.time() < cached[1]:
+            return cached
+        return None
+
+    def _robots_for(self, scheme: str, host: str, session_key, deadline: float) -> robotparser.RobotFileParser:
+        entry = self._cached_robots(host)
+        if entry is None:
+            # Single-flight: concurrent sessions hitting a new host wait for one fetch.
+            with self._robots_lock:
+                fetch_lock = self._robots_fetch_locks.setdefault(host, threading.Lock())
+            if not fetch_lock.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                raise FetchTimeout(f"Timed out waiting for robots.txt of {host}; try again later")
+            try:
+                entry = self._cached_robots(host)
+                if entry is None:
+                    parser, ttl = self._fetch_robots(scheme, host, session_key, deadline)
+                    entry = (parser, time.time() + ttl)
+                    with self._robots_lock:
+                        self._robots[host] = entry
+            finally:
+                fetch_lock.release()
+
+        if entry[0] is None:
+            raise RobotsUnavailable(f"robots.txt for {host} is temporarily unavailable; retry later")
+        return entry[0]
+
+    def _fetch_robots(self, scheme: str, host: str, session_key, deadline: float):
+        """Returns (parser, seconds to cache it); parser is None if robots.txt is unavailable."""
+        parser = robotparser.RobotFileParser(f"{scheme}://{host}/robots.txt")
+        try:
+            response = self._get(parser.url, host, session_key, deadline)
+        except requests.RequestException as e:
+            logger.warning(f"[CRAWL] robots.txt unavailable for {host}: {e}")
+            return None, ROBOTS_RETRY_TTL
+
+        status = response.status_code
+        if status in RETRY_STATUSES or status >= 500:
+            # Still throttled/failing after retries: don't guess, ask again soon.
+            logger.warning(f"[CRAWL] robots.txt for {host} returned {status}; retrying later")
+            return None, ROBOTS_RETRY_TTL
+        if status >= 400:
+            parser.allow_all = True
+            return parser, ROBOTS_TTL
+
+        parser.parse(response.text.splitlines())
+        delay = parser.crawl_delay(self.user_agent)
+        if delay:
+            with self._cond:
+                state = self._host(host)
+                state.rate = min(self.rate, 1.0 / float(delay))
+                # No bursts under Crawl-delay, and the robots.txt fetch itself counts.
+                state.burst = 1
+                state.tokens = min(state.tokens, 0.0)
+        return parser, ROBOTS_TTL
+
+    # --- scheduling ---
+
+    def _acquire(self, host: str, session_key, deadline: float):
+        """Waits for this session's turn on `host`; raises FetchTimeout rather than wait past `deadline`."""
+        ticket = object()
+        with self._cond:
+            state = self._host(host)
+            state.waiting.setdefault(session_key, deque()).append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if state.blocked_until > deadline:
+                        raise FetchTimeout(f"{host} is throttling us; try again later")
+                    if state.next_ticket() is ticket:
+                        delay = state.wait_time(now)
+                        if delay == 0:
+                            state.serve(session_key)
+                            return
+                        if now + delay > deadline:
+                            raise FetchTimeout(f"{host} is busy; try again later")
+                        self._cond.wait(delay)
+                    else:
+                        if now >= deadline:
+                            raise FetchTimeout(f"{host} is busy; try again later")
+                        self._cond.wait(deadline - now)
+            except FetchTimeout:
+                state.withdraw(session_key, ticket)
+                raise
+            finally:
+                self._cond.notify_all()
+
+    def _backoff(self, host: str, retry_after: Optional[float]):
+        with self._cond:
+            state = self._host(host)
+            state.failures += 1
+            delay = retry_after if retry_after is not None else self.backoff_base ** state.failures
+            state.blocked_until = max(state.blocked_until, time.monotonic() + min(delay, self.max_backoff))
+            self._cond.notify_all()
+        logger.warning(f"[CRAWL] {host} throttled us; backing off {min(delay, self.max_backoff):.1f}s")
+
+    def _succeeded(self, host: str):
+        with self._cond:
+            self._host(host).failures = 0
+
+    def _get(self, url: str, host: str, session_key, deadline: float) -> requests.Response:
+        """Paced GET with backoff and retry on 429/503; returns the last response."""
+        for attempt in range(self.max_retries + 1):
+            self._acquire(host, session_key, deadline)
+            response = self.session.get(url, timeout=min(self.timeout, max(deadline - time.monotonic(), 0.1)))
+            if response.status_code not in RETRY_STATUSES:
+                self._succeeded(host)
+                break
+            self._backoff(host, _retry_after_seconds(response.headers.get("Retry-After")))
+            if attempt == self.max_retries:
+                break
+        return response
+
+    def fetch(self, url: str, session_key=None) -> requests.Response:
+        """GETs `url` politely within max_fetch_time seconds.
+
+        Raises RobotsDisallowed, RobotsUnavailable, FetchTimeout or requests exceptions.
+        """
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        if session_key is None:
+            session_key = threading.get_ident()
+        deadline = time.monotonic() + self.max_fetch_time
+
+        robots = self._robots_for(parts.scheme or "https", host, session_key, deadline)
+        if not robots.can_fetch(self.user_agent, url):
+            raise RobotsDisallowed(f"{url} is disallowed by robots.txt")
+
+        response = self._get(url, host, session_key, deadline)
+        response.raise_for_status()
+        return response
+
+
+crawler = PoliteCrawler()
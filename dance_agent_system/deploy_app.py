@@ -1,9 +1,14 @@
 
 import asyncio
+import os
+import time
 from agents import discovery_agent, dancer_finder_agent, application_agent
 from protocol import format_message, compact_context
 from google.adk.runners import InMemoryRunner
 from logger import logger
+from session import DATA_DIR
+from budget import QueryBudget, budget_scope
+from replay import archive_scope, ReplayMiss
 
 class DanceAgentApp:
     """Dance Agent Application for Vertex AI Agent Engine."""
@@ -27,40 +32,72 @@ class DanceAgentApp:
         return asyncio.run(self._run_async(user_query))
 
     async def _run_async(self, user_query: str) -> str:
-        msg_1 = format_message("User", "DiscoveryAgent", user_query)
-        runner1 = InMemoryRunner(agent=self.discovery_agent)
-        await runner1.run_debug(msg_1, verbose=True)
-        
+        # Each query gets its own token / tool-call / wall-time budget across all agents,
+        # and is recorded or replayed if DANCE_AGENT_RECORD / DANCE_AGENT_REPLAY is set.
+        # Recordings go to a new file per query so concurrent queries don't collide.
+        with archive_scope(per_query=True) as archive, budget_scope(QueryBudget.from_env()) as usage:
+            if archive is not None:
+                archive.track_budget(usage)
+            try:
+                final_output = await self._run_pipeline(user_query, usage)
+            except ReplayMiss as e:
+                logger.error(f"[REPLAY] Query diverged from the archive: {e}")
+                final_output = f"Replay failed: {e}"
+        logger.info(f"Query usage:\n{usage.report()}")
+        return final_output
+
+    async def _run_agent(self, agent, message, usage):
+        if usage.check():
+            logger.warning(f"Skipping {agent.name} (Budget exhausted: {usage.exceeded})")
+            return
+        runner = InMemoryRunner(agent=agent)
+        await runner.run_debug(message, verbose=True)
+
+    def _read_output(self, filename, since):
+        """Reads an agent's output file, ignoring one left over from an earlier query."""
+        path = os.path.join(DATA_DIR, filename)
         try:
-            with open("data/opportunities_found.txt", "r") as f:
-                opp_ctx = f.read()
+            if os.path.getmtime(path) < since:
+                return None
+            with open(path, "r") as f:
+                return f.read()
         except FileNotFoundError:
-            opp_ctx = "No opportunities found."
+            return None
+
+    def _partial_results(self, usage, opportunities, dancers, applications) -> str:
+        sections = [f"Stopped early: {usage.exceeded}."]
+        for title, content in (("Opportunities", opportunities), ("Dancers", dancers),
+                               ("Applications", applications)):
+            sections.append(f"{title}:\n{content}" if content else f"{title}: not produced in this run.")
+        sections.append(f"Usage:\n{usage.report()}")
+        return "\n\n".join(sections)
+
+    async def _run_pipeline(self, user_query: str, usage) -> str:
+        started = time.time()
+
+        msg_1 = format_message("User", "DiscoveryAgent", user_query)
+        await self._run_agent(self.discovery_agent, msg_1, usage)
+        
+        opportunities = self._read_output("opportunities_found.txt", started)
+        opp_ctx = opportunities or "No opportunities found."
 
         compacted_opp_ctx = compact_context(opp_ctx)
         dancer_content = f"{user_query}\n\nContext:\n{compacted_opp_ctx}"
         msg_2 = format_message("DiscoveryAgent", "DancerFinderAgent", dancer_content)
         
-        runner2 = InMemoryRunner(agent=self.dancer_finder_agent)
-        await runner2.run_debug(msg_2, verbose=True)
+        await self._run_agent(self.dancer_finder_agent, msg_2, usage)
         
-        try:
-            with open("data/dancers_found.txt", "r") as f:
-                dancers_ctx = f.read()
-        except FileNotFoundError:
-            dancers_ctx = "No dancers found."
+        dancers = self._read_output("dancers_found.txt", started)
+        dancers_ctx = dancers or "No dancers found."
 
         compacted_dancers_ctx = compact_context(dancers_ctx)
         app_content = f"Help apply.\n\nContext:\nOpportunities: {compacted_opp_ctx}\nDancers: {compacted_dancers_ctx}"
         msg_3 = format_message("DancerFinderAgent", "ApplicationAgent", app_content)
         
-        runner3 = InMemoryRunner(agent=self.application_agent)
-        await runner3.run_debug(msg_3, verbose=True)
+        await self._run_agent(self.application_agent, msg_3, usage)
         
-        try:
-            with open("data/applications_drafted.txt", "r") as f:
-                final_output = f.read()
-        except FileNotFoundError:
-            final_output = "Failed to draft applications."
-            
-        return final_output
+        applications = self._read_output("applications_drafted.txt", started)
+        if usage.exhausted:
+            # Only what this query produced before the budget ran out.
+            return self._partial_results(usage, opportunities, dancers, applications)
+        return applications or "Failed to draft applications."
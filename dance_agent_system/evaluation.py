@@ -1,7 +1,6 @@
 import os
 import asyncio
 from dotenv import load_dotenv
-from google.adk.models.google_llm import Gemini
 from google.genai import types
 
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
@@ -13,7 +12,10 @@ retry_config = types.HttpRetryOptions(
     http_status_codes=[429, 500, 503, 504],
 )
 
-model = Gemini(model="gemini-2.5-flash", retry_options=retry_config)
+from cache import CachedGemini, cacheable
+from budget import QueryBudget, budget_scope
+
+model = CachedGemini(model="gemini-2.5-flash", retry_options=retry_config)
 
 from google.adk.models.llm_request import LlmRequest
 
@@ -56,11 +58,17 @@ async def evaluate_agent_output():
     print("Sending evaluation request to LLM!!!")
     request = LlmRequest(prompt=prompt_text)
     response_text = ""
-    async for chunk in model.generate_content_async(request):
-        response_text += chunk.text
+    # Same outputs -> same judge prompt, so reuse the previous verdict.
+    with cacheable(), budget_scope(QueryBudget.from_env()) as usage:
+        usage.model_calls += 1
+        async for chunk in model.generate_content_async(request):
+            response_text += chunk.text
+            usage.record_usage(chunk.usage_metadata)
         
     print("\n=== EVALUATION REPORT ===")
     print(response_text)
+    print("\n=== USAGE ===")
+    print(usage.report())
 
 if __name__ == "__main__":
     asyncio.run(evaluate_agent_output())
@@ -21,6 +21,8 @@ from agents import discovery_agent, dancer_finder_agent, application_agent
 from logger import logger
 from session import load_state
 from protocol import format_message, compact_context
+from budget import QueryBudget, budget_scope, current_usage
+from replay import archive_scope, current_archive, ask_user, ReplayMiss
 
 async def run_agent_if_needed(agent_name, agent, message, output_key, runner_cls=InMemoryRunner, verbose=True):
     """Runs an agent only if its output is not already present.
@@ -36,10 +38,16 @@ async def run_agent_if_needed(agent_name, agent, message, output_key, runner_cls
     Returns:
         The agent's output (loaded from file)
     """
-    existing_data = load_state(output_key)
+    # A recorded or replayed run must actually execute every agent.
+    existing_data = None if current_archive() else load_state(output_key)
     if existing_data:
         logger.info(f"--- Skipping {agent_name} (Found cached data) ---")
         return existing_data
+
+    usage = current_usage()
+    if usage is not None and usage.check():
+        logger.warning(f"--- Skipping {agent_name} (Budget exhausted: {usage.exceeded}) ---")
+        return None
     
     logger.info(f"--- Running {agent_name} ---")
     runner = runner_cls(agent=agent)
@@ -57,7 +65,7 @@ def get_user_feedback(stage_name, next_agent_name=None):
         print(f"Review the output above. Enter feedback for {next_agent_name} (or press Enter to continue):")
     else:
         print(f"Review the output above. Enter feedback (or press Enter to continue):")
-    return input("> ").strip()
+    return ask_user("> ").strip()
 
 async def main():
     """Main orchestration function that coordinates all three agents.
@@ -77,7 +85,7 @@ async def main():
     print("\n" + "="*50)
     print("Welcome to the Dance Agent System!")
     print("="*50)
-    user_name = input("Enter your name: ").strip()
+    user_name = ask_user("Enter your name: ").strip()
     if not user_name:
         user_name = "User"  # Default fallback
     
@@ -106,38 +114,47 @@ CURRENT REQUEST:
 """
     logger.info(f"Query: {user_query}\n")
 
-    msg_1 = format_message("User", "DiscoveryAgent", full_context)
+    # Per-query budget across all agents (DANCE_AGENT_MAX_* env vars); time spent
+    # waiting for user feedback does not count towards the wall-time limit.
+    with budget_scope(QueryBudget.from_env()) as usage:
+        archive = current_archive()
+        if archive is not None:
+            archive.track_budget(usage)
+
+        msg_1 = format_message("User", "DiscoveryAgent", full_context)
     
-    opp_ctx = await run_agent_if_needed(
-        "Discovery Agent", 
-        discovery_agent, 
-        msg_1, 
-        "opportunities_found"  # Output file to check/create
-    ) or "No opportunities yet."
+        opp_ctx = await run_agent_if_needed(
+            "Discovery Agent", 
+            discovery_agent, 
+            msg_1, 
+            "opportunities_found"  # Output file to check/create
+        ) or "No opportunities yet."
     
-    feedback_1 = get_user_feedback("Discovery Agent", "Dancer Finder Agent")
+        with usage.paused():
+            feedback_1 = get_user_feedback("Discovery Agent", "Dancer Finder Agent")
     
-    compacted_opp_ctx = compact_context(opp_ctx)
+        compacted_opp_ctx = compact_context(opp_ctx)
     
-    dancer_content = f"{user_query}\n\nContext:\n{compacted_opp_ctx}"
+        dancer_content = f"{user_query}\n\nContext:\n{compacted_opp_ctx}"
     
-    if feedback_1:
-        dancer_content += f"\n\nUSER FEEDBACK:\n{feedback_1}"
+        if feedback_1:
+            dancer_content += f"\n\nUSER FEEDBACK:\n{feedback_1}"
         
-    msg_2 = format_message("DiscoveryAgent", "DancerFinderAgent", dancer_content, metadata={"source": "opportunities_found"})
+        msg_2 = format_message("DiscoveryAgent", "DancerFinderAgent", dancer_content, metadata={"source": "opportunities_found"})
     
-    dancers_ctx = await run_agent_if_needed(
-        "Dancer Finder Agent",
-        dancer_finder_agent,
-        msg_2,
-        "dancers_found"
-    ) or "No dancers yet."
+        dancers_ctx = await run_agent_if_needed(
+            "Dancer Finder Agent",
+            dancer_finder_agent,
+            msg_2,
+            "dancers_found"
+        ) or "No dancers yet."
 
-    feedback_2 = get_user_feedback("Dancer Finder Agent", "Application Agent")
+        with usage.paused():
+            feedback_2 = get_user_feedback("Dancer Finder Agent", "Application Agent")
 
-    compacted_dancers_ctx = compact_context(dancers_ctx)
+        compacted_dancers_ctx = compact_context(dancers_ctx)
     
-    app_content = f"""
+        app_content = f"""
 Help {user_name} apply.
 
 CONTEXT:
@@ -151,17 +168,17 @@ TASK:
 Draft applications. Save to 'applications_drafted.txt'.
 If no specific opportunities, draft general inquiry.
 """
-    if feedback_2:
-        app_content += f"\n\nUSER FEEDBACK:\n{feedback_2}"
+        if feedback_2:
+            app_content += f"\n\nUSER FEEDBACK:\n{feedback_2}"
 
-    msg_3 = format_message("DancerFinderAgent", "ApplicationAgent", app_content)
+        msg_3 = format_message("DancerFinderAgent", "ApplicationAgent", app_content)
 
-    await run_agent_if_needed(
-        "Application Agent",
-        application_agent,
-        msg_3,
-        "applications_drafted"
-    )
+        await run_agent_if_needed(
+            "Application Agent",
+            application_agent,
+            msg_3,
+            "applications_drafted"
+        )
 
     logger.info("Done.")
     
@@ -174,5 +191,16 @@ If no specific opportunities, draft general inquiry.
         else:
             logger.warning(f"\n❌ {fname}.txt missing")
 
+    logger.info("=== USAGE ===")
+    logger.info(usage.report())
+
+async def run():
+    """Runs main(), recording or replaying it if DANCE_AGENT_RECORD / DANCE_AGENT_REPLAY is set."""
+    with archive_scope():
+        try:
+            await main()
+        except ReplayMiss as e:
+            logger.error(f"[REPLAY] Run diverged from the archive: {e}")
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
@@ -0,0 +1,217 @@
+"""Snapshot / replay of full pipeline runs.
+
+Record mode captures every model request/response, search_web result, fetched
+page and user prompt answer of a `main.py` or `DanceAgentApp.query` run into a
+gzip-compressed JSON-lines archive. Replay mode re-executes the orchestration
+against that archive: model calls and web tools are answered from it, so the run
+needs no network and finishes at full speed. Use it to profile the Python-side
+overhead or as a deterministic benchmark fixture.
+
+    DANCE_AGENT_RECORD=data/run.jsonl.gz python main.py
+    DANCE_AGENT_REPLAY=data/run.jsonl.gz python main.py
+
+Local tools such as save_results still run during replay. Token usage is counted
+from the recorded responses, and the query budget runs out at the same point it
+did while recording (live limits are not applied on replay).
+
+DanceAgentApp records each query to its own file next to DANCE_AGENT_RECORD,
+e.g. data/run-20250101-120000-1a2b3c4d.jsonl.gz.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from google.adk.models.llm_response import LlmResponse
+from budget import BudgetUsage, current_usage
+from cache import request_key
+from logger import logger
+
+# Tools whose results come from the network and are therefore captured.
+RECORDED_TOOLS = {"search_web", "browse_website"}
+
+
+class ReplayMiss(Exception):
+    """Replay reached a call that is not in the archive."""
+
+
+def _tool_key(tool_name: str, args: dict) -> str:
+    blob = json.dumps({"tool": tool_name, "args": args}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class RunArchive:
+    """Records calls to, or replays them from, one compressed archive file."""
+
+    def __init__(self, path: str, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown archive mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._records = []
+        self.pending_model_keys = {}
+        self.usage = None
+        # kind -> key -> queue of recorded values, consumed in recording order
+        self._replay = defaultdict(lambda: defaultdict(deque))
+        if mode == "replay":
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                self._replay[record["kind"]][record["key"]].append(record["value"])
+        logger.info(f"[REPLAY] Loaded {self.path}")
+
+    def track_budget(self, usage: BudgetUsage):
+        """Saves where `usage` runs out when recording; makes it run out there again on replay."""
+        self.usage = usage
+        if self.replaying:
+            queue = self._replay["budget"].get("exhausted")
+            usage.follow(queue[0] if queue else None)
+
+    def save(self):
+        records = list(self._records)
+        if self.usage is not None and self.usage.exhausted_at is not None:
+            records.append({"kind": "budget", "key": "exhausted", "value": {
+                "check": self.usage.exhausted_at, "reason": self.usage.exceeded}})
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8", compresslevel=9) as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        logger.info(f"[RECORD] Saved {len(self._records)} calls to {self.path}")
+
+    def record(self, kind: str, key: str, value):
+        self._records.append({"kind": kind, "key": key, "value": value})
+
+    def take(self, kind: str, key: str):
+        queue = self._replay[kind].get(key)
+        if not queue:
+            raise ReplayMiss(f"No recorded {kind} call for key {key[:12]} in {self.path}")
+        # Keep the last value so extra identical calls still get an answer.
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def ask(self, prompt: str) -> str:
+        """input() that is captured when recording and answered from the archive on replay."""
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        if self.replaying:
+            answer = self.take("input", key)
+            print(f"{prompt}{answer}")
+            return answer
+        answer = input(prompt)
+        self.record("input", key, answer)
+        return answer
+
+
+_current_archive = ContextVar("run_archive", default=None)
+
+
+def _per_query_path(path: str) -> str:
+    stem, ext = path, ""
+    for suffix in (".jsonl.gz", ".gz", ".jsonl"):
+        if path.endswith(suffix):
+            stem, ext = path[:-len(suffix)], suffix
+            break
+    return f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}{ext}"
+
+
+@contextmanager
+def archive_scope(path: Optional[str] = None, mode: Optional[str] = None, per_query: bool = False):
+    """Records or replays every agent run inside the block.
+
+    Without arguments, reads DANCE_AGENT_RECORD / DANCE_AGENT_REPLAY; if neither is
+    set the block runs normally and yields None. With per_query=True a recording
+    goes to a new, uniquely named file next to `path`, so concurrent or repeated
+    queries do not overwrite each other.
+    """
+    if path is None:
+        if os.getenv("DANCE_AGENT_REPLAY"):
+            path, mode = os.getenv("DANCE_AGENT_REPLAY"), "replay"
+        elif os.getenv("DANCE_AGENT_RECORD"):
+            path, mode = os.getenv("DANCE_AGENT_RECORD"), "record"
+        else:
+            yield None
+            return
+    if per_query and mode == "record":
+        path = _per_query_path(path)
+
+    archive = RunArchive(path, mode)
+    token = _current_archive.set(archive)
+    try:
+        yield archive
+    finally:
+        _current_archive.reset(token)
+        if archive.recording:
+            archive.save()
+
+
+def current_archive() -> Optional[RunArchive]:
+    return _current_archive.get()
+
+
+def ask_user(prompt: str) -> str:
+    archive = current_archive()
+    return archive.ask(prompt) if archive else input(prompt)
+
+
+# --- Agent callbacks ---
+
+def replay_model_request(callback_context, llm_request) -> Optional[LlmResponse]:
+    """before_model_callback: answers from the archive on replay, remembers the key when recording."""
+    archive = current_archive()
+    if archive is None:
+        return None
+    key = request_key(llm_request.model or "", llm_request)
+    if archive.replaying:
+        response = LlmResponse.model_validate(archive.take("model", key))
+        # after_model callbacks are skipped for this response, so count its tokens here.
+        usage = current_usage()
+        if usage is not None:
+            usage.record_usage(response.usage_metadata)
+        return response
+    archive.pending_model_keys[callback_context.invocation_id] = key
+    return None
+
+
+def record_model_response(callback_context, llm_response) -> Optional[LlmResponse]:
+    """after_model_callback: stores the final response for the request seen in replay_model_request."""
+    archive = current_archive()
+    if archive is None or not archive.recording or llm_response.partial:
+        return None
+    key = archive.pending_model_keys.pop(callback_context.invocation_id, None)
+    if key is not None:
+        archive.record("model", key, llm_response.model_dump(mode="json", exclude_none=True))
+    return None
+
+
+def replay_tool_call(tool, args, tool_context) -> Optional[dict]:
+    """before_tool_callback: answers network tools from the archive on replay."""
+    archive = current_archive()
+    if archive is None or not archive.replaying or tool.name not in RECORDED_TOOLS:
+        return None
+    return archive.take("tool", _tool_key(tool.name, args))
+
+
+def record_tool_result(tool, args, tool_context, tool_response) -> Optional[dict]:
+    """after_tool_callback: stores network tool results when recording."""
+    archive = current_archive()
+    if archive is None or not archive.recording or tool.name not in RECORDED_TOOLS:
+        return None
+    value = tool_response if isinstance(tool_response, dict) else {"result": tool_response}
+    archive.record("tool", _tool_key(tool.name, args), value)
+    return None
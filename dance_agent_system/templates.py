@@ -0,0 +1,90 @@
+"""Build-time compilation of agent instructions and tool declarations.
+
+By default ADK re-scans a string instruction for `{state_key}` placeholders on
+each model request, and older ADK releases also re-derive every function tool's
+declaration each time (newer ones cache it). Agents built with these helpers pay
+that cost once, at construction time.
+"""
+
+import re
+from typing import Callable
+
+from google.adk.tools import FunctionTool
+
+# Same placeholder syntax ADK uses: {key} is required, {key?} is optional.
+_PLACEHOLDER = re.compile(r"(?<![\$\{\\])\{+([^{}]*)\}+")
+_STATE_PREFIXES = ("app:", "user:", "temp:")
+
+
+def _is_state_name(name: str) -> bool:
+    for prefix in _STATE_PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    return name.isidentifier()
+
+
+def compile_instruction(template: str):
+    """Pre-splits an instruction template into literal text and state lookups.
+
+    Always returns an InstructionProvider, so ADK skips its own state injection.
+    A template without placeholders becomes a constant provider; otherwise the
+    provider only joins the pre-split pieces with values from session state.
+    Missing required keys raise KeyError, as ADK does.
+    """
+    pieces = []
+    last = 0
+    for match in _PLACEHOLDER.finditer(template):
+        name = match.group(1).strip()
+        optional = name.endswith("?")
+        name = name.rstrip("?")
+        if not _is_state_name(name):
+            continue
+        pieces.append(template[last:match.start()])
+        pieces.append((name, optional))
+        last = match.end()
+
+    if not pieces:
+        def constant(readonly_context) -> str:
+            return template
+
+        return constant
+    pieces.append(template[last:])
+
+    def render(readonly_context) -> str:
+        state = readonly_context.state
+        out = []
+        for piece in pieces:
+            if isinstance(piece, str):
+                out.append(piece)
+                continue
+            name, optional = piece
+            if name in state:
+                value = state[name]
+                out.append("" if value is None else str(value))
+            elif optional:
+                out.append("")
+            else:
+                raise KeyError(f"Context variable not found: `{name}` in agent '{readonly_context.agent_name}'.")
+        return "".join(out)
+
+    return render
+
+
+class FrozenFunctionTool(FunctionTool):
+    """FunctionTool whose declaration is derived once and then reused.
+
+    Each request gets its own deep copy, since callers may mutate it.
+    """
+
+    def __init__(self, func: Callable, **kwargs):
+        super().__init__(func, **kwargs)
+        self._frozen_declaration = super()._get_declaration()
+
+    def _get_declaration(self):
+        return self._frozen_declaration.model_copy(deep=True)
+
+
+def freeze_tools(*funcs: Callable) -> list:
+    """Wraps plain tool functions as FrozenFunctionTools."""
+    return [FrozenFunctionTool(func) for func in funcs]
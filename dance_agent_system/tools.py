@@ -1,8 +1,8 @@
 import os
-import requests
 from bs4 import BeautifulSoup
 from ddgs import DDGS
 from logger import logger
+from crawler import crawler, RobotsDisallowed, RobotsUnavailable, FetchTimeout
 
 def search_web(query: str, num_results: int = 10) -> str:
     logger.info(f"[SEARCH] {query}")
@@ -24,12 +24,12 @@ def search_web(query: str, num_results: int = 10) -> str:
     
     return "\n".join(results)
 
-def browse_website(url: str) -> str:
+def browse_website(url: str, tool_context=None) -> str:
     logger.info(f"[BROWSE] {url}")
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
+        # Paced per domain and shared fairly between concurrent sessions (see crawler.py).
+        session_key = getattr(tool_context, "invocation_id", None)
+        response = crawler.fetch(url, session_key=session_key)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -47,6 +47,9 @@ def browse_website(url: str) -> str:
             
         return text
         
+    except (RobotsDisallowed, RobotsUnavailable, FetchTimeout) as e:
+        logger.warning(f"Browse skipped: {e}")
+        return f"Error: {e}"
     except Exception as e:
         logger.error(f"Browse error: {e}")
         return f"Error: {e}"
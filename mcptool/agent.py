@@ -7,8 +7,10 @@ from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from mcp import StdioServerParameters
 from google.adk.runners import InMemoryRunner
-from IPython.display import display, Image as IPImage
-import base64
+import uuid
+
+from .images import ImageSink, iter_image_items
+from .pool import mcp_pool
 
 retry_config = types.HttpRetryOptions(
     attempts=5,  # Maximum retry attempts
@@ -17,19 +19,26 @@ retry_config = types.HttpRetryOptions(
     http_status_codes=[429, 500, 503, 504],  # Retry on these HTTP errors
 )
 
-mcp_image_server = McpToolset(
-    connection_params=StdioConnectionParams(
-        server_params=StdioServerParameters(
-            command="npx",
-            args=[
-                "-y",
-                "@modelcontextprotocol/server-everything",
-            ],
-            tool_filter=["getTinyImage"],
+def _make_image_server():
+    return McpToolset(
+        connection_params=StdioConnectionParams(
+            server_params=StdioServerParameters(
+                command="npx",
+                args=[
+                    "-y",
+                    "@modelcontextprotocol/server-everything",
+                ],
+            ),
+            timeout=30,
         ),
-        timeout=30,
+        tool_filter=["getTinyImage"],
     )
-)
+
+
+# The npx server is started once and kept warm in the pool, shared by every
+# runner and query (across event loops). It is shut down at interpreter exit,
+# or earlier with `mcp_pool.close()`.
+mcp_image_server = mcp_pool.register("everything", _make_image_server)
 
 root_agent = LlmAgent(
     model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
@@ -40,14 +49,23 @@ root_agent = LlmAgent(
 
 
 
-async def print_image():
-    runner = InMemoryRunner(agent=root_agent)
-    response = await runner.run_debug("Provide a sample tiny image", verbose=True)
+_runner = None
+
+
+async def print_image(store_dir=None):
+    """Runs the image agent and shows each distinct image once.
+
+    Images are streamed to a content-addressed store (default: a private temp dir) and
+    displayed inline under IPython; headless, their paths are printed.
+    """
+    global _runner
+    if _runner is None:
+        _runner = InMemoryRunner(agent=root_agent)
+    # Fresh session per call so queries don't accumulate each other's history.
+    response = await _runner.run_debug(
+        "Provide a sample tiny image", session_id=str(uuid.uuid4()), verbose=True
+    )
 
-    for event in response:
-        if event.content and event.content.parts:
-            for part in event.content.parts:
-                if hasattr(part, "function_response") and part.function_response:
-                    for item in part.function_response.response.get("content", []):
-                        if item.get("type") == "image":
-                            display(IPImage(data=base64.b64decode(item["data"])))
\ No newline at end of file
+    sink = ImageSink(store_dir=store_dir)
+    sink.add_all(iter_image_items(response))
+    return sink.paths
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""Startup / first-call latency benchmark for the MCP toolset pool.
+
+Compares spawning a fresh MCP server per query (what a new runner or process
+pays today) with borrowing a warm one from McpToolsetPool. Each query runs in
+its own `asyncio.run()`, as in a script or DanceAgentApp. Uses the local stub
+server, so no Node or network is needed:
+
+    python -m mcptool.benchmark --iterations 10 --startup-delay 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
+from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
+from mcp import StdioServerParameters
+
+from .pool import McpToolsetPool
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_server.py")
+
+
+def make_stub_toolset(startup_delay: float) -> McpToolset:
+    return McpToolset(
+        connection_params=StdioConnectionParams(
+            server_params=StdioServerParameters(
+                command=sys.executable,
+                args=[STUB_SERVER, "--startup-delay", str(startup_delay)],
+            ),
+            timeout=30,
+        ),
+        tool_filter=["getTinyImage"],
+    )
+
+
+async def _cold_query(startup_delay: float) -> float:
+    start = time.perf_counter()
+    toolset = make_stub_toolset(startup_delay)
+    await toolset.get_tools()
+    elapsed = time.perf_counter() - start
+    await toolset.close()
+    return elapsed
+
+
+def bench_cold(iterations: int, startup_delay: float) -> list:
+    return [asyncio.run(_cold_query(startup_delay)) for _ in range(iterations)]
+
+
+async def _timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+def bench_pooled(iterations: int, startup_delay: float) -> tuple:
+    pool = McpToolsetPool()
+    try:
+        handle = pool.register("stub", lambda: make_stub_toolset(startup_delay))
+        warm_up = asyncio.run(_timed(pool.warm_up()))
+        timings = [asyncio.run(_timed(handle.get_tools())) for _ in range(iterations)]
+    finally:
+        pool.close()
+    return warm_up, timings
+
+
+def report(label: str, timings: list):
+    print(
+        f"{label:<10} mean {statistics.mean(timings) * 1000:8.1f} ms"
+        f"   p50 {statistics.median(timings) * 1000:8.1f} ms"
+        f"   max {max(timings) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--startup-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    cold = bench_cold(args.iterations, args.startup_delay)
+    warm_up, pooled = bench_pooled(args.iterations, args.startup_delay)
+
+    print(f"First-call latency over {args.iterations} queries:")
+    report("cold", cold)
+    report("pooled", pooled)
+    print(f"pool warm-up (paid once): {warm_up * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
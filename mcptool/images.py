@@ -0,0 +1,144 @@
+import binascii
+import hashlib
+import mimetypes
+import os
+import tempfile
+from typing import Dict, Iterable, Iterator, Optional
+
+try:
+    from IPython import get_ipython
+    from IPython.display import display, Image as IPImage
+except ImportError:  # headless: no IPython installed
+    get_ipython = None
+
+# Multiple of 4 so every chunk decodes independently (~48 KiB of output per chunk).
+DECODE_CHUNK = 64 * 1024
+
+
+def iter_decoded_chunks(data: str, chunk_size: int = DECODE_CHUNK) -> Iterator[bytes]:
+    """Decodes base64 piecewise, without a full-size intermediate buffer.
+
+    Whitespace (e.g. line-wrapped base64) is dropped per slice and any partial
+    4-character group is carried into the next slice.
+    """
+    carry = ""
+    for start in range(0, len(data), chunk_size):
+        piece = carry + "".join(data[start:start + chunk_size].split())
+        usable = len(piece) - len(piece) % 4
+        carry = piece[usable:]
+        if usable:
+            yield binascii.a2b_base64(piece[:usable])
+    if carry:
+        yield binascii.a2b_base64(carry)
+
+
+def payload_digest(data: str, chunk_size: int = DECODE_CHUNK) -> str:
+    """SHA-256 of a base64 payload, hashed slice by slice to avoid a full-size copy.
+
+    Only a fast key for spotting repeats of the same payload: the same image
+    encoded differently (e.g. line-wrapped) gets a different payload digest.
+    """
+    digest = hashlib.sha256()
+    for start in range(0, len(data), chunk_size):
+        digest.update(data[start:start + chunk_size].encode("ascii"))
+    return digest.hexdigest()
+
+
+_default_store_dir = None
+
+
+def default_store_dir() -> str:
+    """Private (0700) per-process store directory, created on first use."""
+    global _default_store_dir
+    if _default_store_dir is None:
+        _default_store_dir = tempfile.mkdtemp(prefix="mcp_images_")
+    return _default_store_dir
+
+
+def iter_image_items(events) -> Iterator[dict]:
+    """Yields the MCP image content items found in function responses."""
+    for event in events:
+        if not (event.content and event.content.parts):
+            continue
+        for part in event.content.parts:
+            if getattr(part, "function_response", None) and part.function_response.response:
+                for item in part.function_response.response.get("content", []):
+                    if item.get("type") == "image":
+                        yield item
+
+
+def _in_ipython() -> bool:
+    return get_ipython is not None and get_ipython() is not None
+
+
+class ImageSink:
+    """Decodes MCP image payloads once, deduplicated by content hash.
+
+    A repeated payload is recognised by the SHA-256 of its base64 text without
+    decoding it again. Each new image is decoded chunk by chunk into a temp file
+    while its decoded bytes are hashed, then stored content-addressed as
+    `<sha256 of image><ext>` under `store_dir` (default: a private temp dir), so
+    no decoded copy is kept in memory. Inside IPython the stored file is
+    displayed inline; headless, or for formats IPython can't show, its path is
+    printed.
+    """
+
+    def __init__(self, store_dir: Optional[str] = None, display_inline: Optional[bool] = None):
+        self.display_inline = _in_ipython() if display_inline is None else display_inline
+        self.store_dir = store_dir or default_store_dir()
+        os.makedirs(self.store_dir, exist_ok=True)
+        # image digest -> stored path
+        self.paths: Dict[str, str] = {}
+        # payload digest -> image digest
+        self._seen: Dict[str, str] = {}
+
+    def _store(self, data: str, ext: str) -> tuple:
+        """Streams the decoded image into the store; returns (digest, path)."""
+        digest = hashlib.sha256()
+        # Random name created with O_EXCL, so a planted file or symlink is never written through.
+        f = tempfile.NamedTemporaryFile(dir=self.store_dir, suffix=".part", delete=False)
+        try:
+            with f:
+                for chunk in iter_decoded_chunks(data):
+                    digest.update(chunk)
+                    f.write(chunk)
+            path = os.path.join(self.store_dir, digest.hexdigest() + ext)
+            # Always replace: whatever was at `path` before, the content is now ours.
+            os.replace(f.name, path)
+        finally:
+            if os.path.exists(f.name):
+                os.remove(f.name)
+        return digest.hexdigest(), path
+
+    def _show(self, path: str):
+        if self.display_inline:
+            try:
+                display(IPImage(filename=path))
+                return
+            except ValueError:  # format IPython can't display
+                pass
+        print(f"Image saved: {path}")
+
+    def add(self, data: str, mime_type: Optional[str] = None) -> str:
+        """Handles one base64 image; returns its content digest. Duplicates are skipped.
+
+        Raises binascii.Error if the payload is not valid base64.
+        """
+        key = payload_digest(data)
+        if key in self._seen:
+            return self._seen[key]
+
+        ext = mimetypes.guess_extension(mime_type or "") or ".bin"
+        digest, path = self._store(data, ext)
+        self._seen[key] = digest
+        if digest not in self.paths:  # not the same image under another encoding
+            self.paths[digest] = path
+            self._show(path)
+        return digest
+
+    def add_all(self, items: Iterable[dict]):
+        for item in items:
+            try:
+                self.add(item["data"], item.get("mimeType"))
+            except binascii.Error as e:
+                print(f"Skipping undecodable image: {e}")
@@ -0,0 +1,195 @@
+import asyncio
+import atexit
+import threading
+import time
+from typing import Callable, Dict
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
+
+
+class McpToolsetPool:
+    """Keeps MCP server subprocesses warm and shares them across runners.
+
+    Each registered server is started once (Node startup, package resolution and
+    the MCP handshake are paid up front) and the same McpToolset is handed to
+    every runner and query. The servers live on one background event loop owned
+    by the pool, so they outlive the callers' loops (each `asyncio.run()` in a
+    script or app) and tool calls are forwarded to that loop. Toolsets are
+    health-checked before reuse and restarted if the server died. Servers are
+    shut down by close() / aclose(), or at interpreter exit.
+    """
+
+    def __init__(self, health_check_interval: float = 30.0, health_check_timeout: float = 10.0,
+                 shutdown_timeout: float = 10.0):
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self._factories: Dict[str, Callable[[], McpToolset]] = {}
+        # Only touched from the pool's loop.
+        self._toolsets: Dict[str, McpToolset] = {}
+        self._last_checked: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        self._loop = None
+        self._thread = None
+        self._loop_lock = threading.Lock()
+        self._atexit_registered = False
+
+    def register(self, name: str, factory: Callable[[], McpToolset]) -> "PooledMcpToolset":
+        """Registers a server and returns a toolset handle to give to agents."""
+        self._factories[name] = factory
+        return PooledMcpToolset(self, name)
+
+    # --- pool loop ---
+
+    def _pool_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-pool", daemon=True)
+                self._thread.start()
+                if not self._atexit_registered:
+                    atexit.register(self.close)
+                    self._atexit_registered = True
+            return self._loop
+
+    async def run(self, coro):
+        """Awaits `coro` on the pool's loop, from whatever loop the caller is on."""
+        loop = self._pool_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    # --- toolsets (run on the pool's loop) ---
+
+    async def acquire(self, name: str) -> McpToolset:
+        """Returns a warm, healthy toolset for `name`, starting it if needed.
+
+        The toolset belongs to the pool's loop: use its tools through run().
+        """
+        return await self.run(self._acquire(name))
+
+    async def _acquire(self, name: str) -> McpToolset:
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            toolset = self._toolsets.get(name)
+            if toolset is not None and time.monotonic() - self._last_checked.get(name, 0) > self.health_check_interval:
+                if await self._is_healthy(toolset):
+                    self._last_checked[name] = time.monotonic()
+                else:
+                    await self._discard(name)
+                    toolset = None
+
+            if toolset is None:
+                toolset = self._factories[name]()
+                self._toolsets[name] = toolset
+                await toolset.get_tools()
+                self._last_checked[name] = time.monotonic()
+
+            return toolset
+
+    async def _get_tools(self, name: str, readonly_context=None) -> list:
+        toolset = await self._acquire(name)
+        return await toolset.get_tools(readonly_context)
+
+    async def _is_healthy(self, toolset: McpToolset) -> bool:
+        try:
+            await asyncio.wait_for(toolset.get_tools(), timeout=self.health_check_timeout)
+        except Exception:
+            return False
+        return True
+
+    async def _discard(self, name: str):
+        toolset = self._toolsets.pop(name, None)
+        self._last_checked.pop(name, None)
+        if toolset is None:
+            return
+        try:
+            await toolset.close()
+        except Exception:
+            pass
+
+    async def _discard_all(self):
+        for name in list(self._toolsets):
+            await self._discard(name)
+
+    # --- lifecycle ---
+
+    async def warm_up(self, *names: str):
+        """Starts the given servers (default: all registered) ahead of the first query."""
+        for name in names or list(self._factories):
+            await self.acquire(name)
+
+    def close(self):
+        """Shuts down every pooled server subprocess and stops the pool's loop.
+
+        Safe to call more than once; registered with atexit on first use.
+        """
+        with self._loop_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._discard_all(), loop).result(self.shutdown_timeout)
+        except Exception:
+            pass
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(self.shutdown_timeout)
+            if not thread.is_alive():
+                loop.close()
+
+    async def aclose(self):
+        """close() for async callers."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+class _PooledMcpTool(BaseTool):
+    """Forwards one MCP tool's calls to the pool's loop, where its session lives."""
+
+    def __init__(self, pool: McpToolsetPool, tool: BaseTool):
+        super().__init__(name=tool.name, description=tool.description, is_long_running=tool.is_long_running)
+        self.pool = pool
+        self.tool = tool
+
+    def _get_declaration(self):
+        return self.tool._get_declaration()
+
+    async def process_llm_request(self, *, tool_context, llm_request) -> None:
+        await self.tool.process_llm_request(tool_context=tool_context, llm_request=llm_request)
+        # Route the call back through this proxy rather than the wrapped tool.
+        llm_request.tools_dict[self.name] = self
+
+    async def run_async(self, *, args, tool_context):
+        return await self.pool.run(self.tool.run_async(args=args, tool_context=tool_context))
+
+
+class PooledMcpToolset(BaseToolset):
+    """Agent-facing handle that borrows its tools from a McpToolsetPool.
+
+    close() is a no-op so that closing a runner leaves the shared server running;
+    use McpToolsetPool.close() to shut it down.
+    """
+
+    def __init__(self, pool: McpToolsetPool, name: str):
+        super().__init__()
+        self.pool = pool
+        self.name = name
+
+    async def get_tools(self, readonly_context=None):
+        tools = await self.pool.run(self.pool._get_tools(self.name, readonly_context))
+        return [_PooledMcpTool(self.pool, tool) for tool in tools]
+
+    async def close(self) -> None:
+        pass
+
+
+mcp_pool = McpToolsetPool()
@@ -0,0 +1,36 @@
+"""Minimal stdio MCP server used by the pool benchmark.
+
+Exposes a `getTinyImage` tool like @modelcontextprotocol/server-everything, without
+needing Node or network access. `--startup-delay` simulates interpreter/package
+start-up cost so the benchmark shows what a warm pool saves.
+"""
+
+import argparse
+import base64
+import time
+
+try:
+    from mcp.server.mcpserver import MCPServer, Image
+except ImportError:  # mcp < 2
+    from mcp.server.fastmcp import FastMCP as MCPServer, Image
+
+# 1x1 transparent PNG
+TINY_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+server = MCPServer("stub-everything")
+
+
+@server.tool()
+def getTinyImage() -> Image:
+    """Returns a tiny test image."""
+    return Image(data=TINY_PNG, format="png")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--startup-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    time.sleep(args.startup_delay)
+    server.run()